@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Automower Archive
+-----------------
+Exports mower_position and mower_status history from InfluxDB into compressed
+columnar archive files, and imports those archives (or raw /v1/mowers JSON
+captured with api_debugger.py) back into InfluxDB using batched writes.
+
+Each archive file holds one measurement for one time chunk as a NumPy .npz
+file with one array per column, so it can be loaded without InfluxDB.
+
+Usage:
+    python automower_tracker/archive.py export --days 90 --out archive/
+    python automower_tracker/archive.py import archive/*.npz
+    python automower_tracker/archive.py import captured_mowers.json
+"""
+
+import os
+import sys
+import json
+import argparse
+import logging
+from datetime import datetime, timezone, timedelta
+from typing import Dict, List, Any, Iterator
+
+import dotenv
+import numpy as np
+from influxdb_client import InfluxDBClient, Point, WritePrecision
+from influxdb_client.client.write_api import WriteOptions
+
+# Load environment variables
+dotenv.load_dotenv()
+
+logger = logging.getLogger("automower_archive")
+
+# InfluxDB configuration
+INFLUXDB_URL = os.getenv("INFLUXDB_URL", "http://localhost:8086")
+INFLUXDB_TOKEN = os.getenv("INFLUXDB_TOKEN")
+INFLUXDB_ORG = os.getenv("INFLUXDB_ORG")
+INFLUXDB_BUCKET = os.getenv("INFLUXDB_BUCKET", "automower")
+
+# Tag columns per archived measurement, everything else is stored as a field
+MEASUREMENT_TAGS = {
+    "mower_position": ["mower_id", "name", "activity", "error"],
+    "mower_status": ["mower_id", "name", "model", "mode", "activity", "state", "error"],
+}
+
+# Columns added by Flux that are not part of the stored data
+FLUX_COLUMNS = {"result", "table", "_start", "_stop", "_time", "_measurement"}
+
+# Number of points per batched write
+WRITE_BATCH_SIZE = 5000
+
+
+def to_nanoseconds(value: datetime) -> int:
+    """Convert a timezone-aware datetime to epoch nanoseconds."""
+    return int(value.timestamp()) * 10**9 + value.microsecond * 1000
+
+
+def export_chunk(query_api, measurement: str, start: datetime, stop: datetime) -> Dict[str, np.ndarray]:
+    """Stream one time chunk of a measurement out of InfluxDB into column arrays."""
+    query = f'''
+    from(bucket: "{INFLUXDB_BUCKET}")
+        |> range(start: {start.strftime("%Y-%m-%dT%H:%M:%S.%fZ")}, stop: {stop.strftime("%Y-%m-%dT%H:%M:%S.%fZ")})
+        |> filter(fn: (r) => r._measurement == "{measurement}")
+        |> pivot(rowKey:["_time"], columnKey: ["_field"], valueColumn: "_value")
+    '''
+
+    tags = MEASUREMENT_TAGS[measurement]
+    times = []
+    columns: Dict[str, List[Any]] = {}
+
+    for row, record in enumerate(query_api.query_stream(query, org=INFLUXDB_ORG)):
+        times.append(to_nanoseconds(record.get_time()))
+        for key, value in record.values.items():
+            if key in FLUX_COLUMNS or value is None:
+                continue
+            if key not in columns:
+                columns[key] = [None] * row
+            columns[key].append(value)
+        # Pad columns missing from this record
+        for values in columns.values():
+            if len(values) <= row:
+                values.append(None)
+
+    if not times:
+        return {}
+
+    arrays = {"_time": np.array(times, dtype=np.int64)}
+    for key, values in columns.items():
+        if key in tags:
+            arrays[key] = np.array(["" if v is None else str(v) for v in values])
+            continue
+
+        # Keep the InfluxDB field type so that re-imported points do not conflict
+        sample = next(v for v in values if v is not None)
+        if isinstance(sample, bool):
+            dtype, fill = np.bool_, False
+        elif isinstance(sample, int):
+            dtype, fill = np.int64, 0
+        elif isinstance(sample, float):
+            dtype, fill = np.float64, 0.0
+        else:
+            dtype, fill = np.str_, ""
+
+        arrays[key] = np.array([fill if v is None else v for v in values], dtype=dtype)
+        present = np.array([v is not None for v in values])
+        if not present.all():
+            arrays[f"{key}.present"] = present
+
+    return arrays
+
+
+def export_archive(out_dir: str, start: datetime, stop: datetime, chunk_hours: int,
+                   measurements: List[str]) -> None:
+    """Export measurements between start and stop as one archive file per chunk."""
+    os.makedirs(out_dir, exist_ok=True)
+
+    with InfluxDBClient(url=INFLUXDB_URL, token=INFLUXDB_TOKEN, org=INFLUXDB_ORG, timeout=300_000) as client:
+        query_api = client.query_api()
+
+        for measurement in measurements:
+            chunk_start = start
+            while chunk_start < stop:
+                chunk_stop = min(chunk_start + timedelta(hours=chunk_hours), stop)
+                arrays = export_chunk(query_api, measurement, chunk_start, chunk_stop)
+
+                if arrays:
+                    path = os.path.join(out_dir, f"{measurement}-{chunk_start.strftime('%Y%m%dT%H%M%SZ')}.npz")
+                    np.savez_compressed(path, _measurement=np.array(measurement), **arrays)
+                    logger.info(f"Exported {len(arrays['_time'])} {measurement} points to {path}")
+
+                chunk_start = chunk_stop
+
+
+def archive_points(path: str) -> Iterator[Point]:
+    """Rebuild InfluxDB points from an archive file."""
+    with np.load(path) as archive:
+        measurement = str(archive["_measurement"])
+        tags = MEASUREMENT_TAGS[measurement]
+        columns = {key: archive[key] for key in archive.files if key not in ("_measurement", "_time")}
+        times = archive["_time"]
+
+    tag_columns = [key for key in columns if key in tags]
+    field_columns = [key for key in columns if key not in tags and not key.endswith(".present")]
+
+    for row in range(len(times)):
+        point = Point(measurement).time(int(times[row]), WritePrecision.NS)
+        for key in tag_columns:
+            if columns[key][row]:
+                point.tag(key, str(columns[key][row]))
+        for key in field_columns:
+            present = columns.get(f"{key}.present")
+            if present is not None and not present[row]:
+                continue
+            point.field(key, columns[key][row].item())
+        yield point
+
+
+def raw_mower_documents(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield mower objects from captured /v1/mowers JSON (one document or JSON Lines)."""
+    with open(path) as f:
+        content = f.read()
+
+    try:
+        documents = [json.loads(content)]
+    except json.JSONDecodeError:
+        documents = [json.loads(line) for line in content.splitlines() if line.strip()]
+
+    for document in documents:
+        data = document.get("data", document) if isinstance(document, dict) else document
+        for mower in data if isinstance(data, list) else [data]:
+            yield mower
+
+
+def import_files(paths: List[str]) -> None:
+    """Bulk-load archive files and captured mower JSON into InfluxDB."""
+    write_options = WriteOptions(batch_size=WRITE_BATCH_SIZE, flush_interval=10_000)
+    archive_paths = [path for path in paths if path.endswith(".npz")]
+    json_paths = [path for path in paths if not path.endswith(".npz")]
+
+    if archive_paths:
+        with InfluxDBClient(url=INFLUXDB_URL, token=INFLUXDB_TOKEN, org=INFLUXDB_ORG) as client:
+            with client.write_api(write_options=write_options) as write_api:
+                for path in archive_paths:
+                    count = 0
+                    for point in archive_points(path):
+                        write_api.write(bucket=INFLUXDB_BUCKET, record=point)
+                        count += 1
+                    logger.info(f"Queued {count} points from {path}")
+
+    if json_paths:
+        # Captured API responses go through the tracker's own transform
+        from automower_tracker import AutomowerTracker
+
+        tracker = AutomowerTracker(write_options=write_options)
+        try:
+            for path in json_paths:
+                count = 0
+                for mower_data in raw_mower_documents(path):
+                    tracker.store_mower_data(mower_data)
+                    count += 1
+                logger.info(f"Imported {count} mower snapshots from {path}")
+        finally:
+            tracker.write_api.close()
+            tracker.influx_client.close()
+
+
+def parse_time(value: str) -> datetime:
+    """Parse an ISO 8601 date or datetime, assuming UTC when no offset is given."""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def main():
+    """Main function"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+
+    parser = argparse.ArgumentParser(description="Automower InfluxDB archive export and import")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="Export history to archive files")
+    export_parser.add_argument("-o", "--out", default="archive", help="Output directory")
+    export_parser.add_argument("--start", type=parse_time, help="Start time (ISO 8601, default: --days ago)")
+    export_parser.add_argument("--stop", type=parse_time, help="Stop time (ISO 8601, default: now)")
+    export_parser.add_argument("--days", type=int, default=30, help="Days to export when --start is not given")
+    export_parser.add_argument("--chunk-hours", type=int, default=24, help="Hours of data per archive file")
+    export_parser.add_argument("-m", "--measurement", action="append", choices=list(MEASUREMENT_TAGS),
+                               help="Measurement to export (default: all)")
+
+    import_parser = subparsers.add_parser("import", help="Import archive files or captured mower JSON")
+    import_parser.add_argument("files", nargs="+", help=".npz archive files or /v1/mowers JSON files")
+
+    args = parser.parse_args()
+
+    if args.command == "export":
+        stop = args.stop or datetime.now(timezone.utc)
+        start = args.start or stop - timedelta(days=args.days)
+        if start >= stop:
+            print("Error: start must be before stop.")
+            sys.exit(1)
+        export_archive(args.out, start, stop, args.chunk_hours, args.measurement or list(MEASUREMENT_TAGS))
+    else:
+        missing = [path for path in args.files if not os.path.exists(path)]
+        if missing:
+            print(f"Error: files not found: {', '.join(missing)}")
+            sys.exit(1)
+        import_files(args.files)
+
+
+if __name__ == "__main__":
+    main()
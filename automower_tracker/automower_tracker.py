@@ -17,11 +17,10 @@ import dotenv
 from influxdb_client import InfluxDBClient, Point
 from influxdb_client.client.write_api import SYNCHRONOUS
 
+from diagnostics import configure_logging, Profiler
+
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-)
+configure_logging(logging.INFO)
 logger = logging.getLogger("automower_tracker")
 
 # Load environment variables
@@ -48,6 +47,10 @@ POLL_INTERVAL = 300
 # Position interval in seconds (time between consecutive position readings)
 POSITION_INTERVAL = 30
 
+# Longest time in seconds between two observed status samples whose interval is still
+# counted in the battery rollup; longer gaps mean the tracker was not running
+BATTERY_MAX_GAP = 3 * POLL_INTERVAL
+
 # Error codes to track
 ERROR_CODES = {
     0: "No message",
@@ -74,22 +77,31 @@ ERROR_CODES = {
 class AutomowerTracker:
     """Tracks Automower location and status data via polling."""
 
-    def __init__(self):
+    def __init__(self, write_options=SYNCHRONOUS):
         self.access_token = None
         self.token_expires_at = 0
         self.mowers = []
         self.running = False
+        # Currently open error incident per mower, keyed by mower_id
+        self.error_events = {}
+        # Last stored position timestamp per mower, keyed by mower_id
+        self.last_position_timestamps = {}
+        # Today's battery rollup and previous status sample per mower, keyed by mower_id
+        self.battery_rollups = {}
+        self.battery_samples = {}
+        # Per-stage timings and cProfile dumps, enabled with AUTOMOWER_PROFILE
+        self.profiler = Profiler()
 
         # Initialize InfluxDB client
         try:
             self.influx_client = InfluxDBClient(
                 url=INFLUXDB_URL, token=INFLUXDB_TOKEN, org=INFLUXDB_ORG
             )
-            self.write_api = self.influx_client.write_api(write_options=SYNCHRONOUS)
+            self.write_api = self.influx_client.write_api(write_options=write_options)
             self.query_api = self.influx_client.query_api()
             # Test InfluxDB connection
             health = self.influx_client.health()
-            logger.info(f"InfluxDB connection: {health.status}")
+            logger.info("InfluxDB connection: %s", health.status)
         except Exception as e:
             logger.error(f"Failed to initialize InfluxDB client: {e}")
             raise
@@ -111,7 +123,7 @@ class AutomowerTracker:
             self.access_token = auth_data["access_token"]
             # Set token expiry time (with a safety margin)
             self.token_expires_at = time.time() + auth_data["expires_in"] - 60
-            logger.info(f"Authentication successful, token expires in {auth_data['expires_in']} seconds")
+            logger.info("Authentication successful, token expires in %s seconds", auth_data["expires_in"])
         except requests.exceptions.RequestException as e:
             logger.error(f"Authentication failed: {e}")
             if hasattr(e, 'response') and e.response:
@@ -136,7 +148,7 @@ class AutomowerTracker:
 
             data = response.json()
             mowers = data.get("data", [])
-            logger.info(f"Found {len(mowers)} mowers")
+            logger.info("Found %d mowers", len(mowers))
 
             return mowers
         except requests.exceptions.RequestException as e:
@@ -150,7 +162,7 @@ class AutomowerTracker:
         if time.time() > self.token_expires_at:
             self.authenticate()
 
-        logger.info(f"Fetching details for mower {mower_id}")
+        logger.info("Fetching details for mower %s", mower_id, extra={"mower_id": mower_id})
         headers = {
             "Authorization": f"Bearer {self.access_token}",
             "Authorization-Provider": "husqvarna",
@@ -170,6 +182,9 @@ class AutomowerTracker:
 
     def get_last_position_timestamp(self, mower_id: str) -> Optional[datetime]:
         """Get the timestamp of the last stored position for a specific mower."""
+        if mower_id in self.last_position_timestamps:
+            return self.last_position_timestamps[mower_id]
+
         try:
             query = f'''
             from(bucket: "{INFLUXDB_BUCKET}")
@@ -184,15 +199,306 @@ class AutomowerTracker:
             if result and len(result) > 0 and len(result[0].records) > 0:
                 # Get the timestamp from the first record
                 last_timestamp = result[0].records[0].get_time()
-                logger.info(f"Last position timestamp for mower {mower_id}: {last_timestamp}")
+                logger.info("Last position timestamp for mower %s: %s", mower_id, last_timestamp,
+                            extra={"mower_id": mower_id})
+                self.last_position_timestamps[mower_id] = last_timestamp
                 return last_timestamp
             else:
-                logger.info(f"No previous position data found for mower {mower_id}")
+                logger.info("No previous position data found for mower %s", mower_id, extra={"mower_id": mower_id})
                 return None
         except Exception as e:
             logger.error(f"Error fetching last position timestamp: {e}")
             return None
 
+    def get_open_error_event(self, mower_id: str) -> Optional[Dict[str, Any]]:
+        """Get the error incident that is still open for a specific mower, if any."""
+        try:
+            query = f'''
+            from(bucket: "{INFLUXDB_BUCKET}")
+              |> range(start: -30d)
+              |> filter(fn: (r) => r._measurement == "mower_error_event")
+              |> filter(fn: (r) => r.mower_id == "{mower_id}")
+              |> pivot(rowKey:["_time"], columnKey: ["_field"], valueColumn: "_value")
+              |> group()
+              |> sort(columns: ["_time"], desc: true)
+              |> limit(n: 1)
+            '''
+
+            result = self.query_api.query(query=query, org=INFLUXDB_ORG)
+
+            for table in result:
+                for record in table.records:
+                    if not record.values.get("active"):
+                        return None
+                    return {
+                        "error_code": record.values.get("error_code", 0),
+                        "started_at": record.get_time(),
+                        "latitude": record.values.get("latitude"),
+                        "longitude": record.values.get("longitude"),
+                    }
+            return None
+        except Exception as e:
+            logger.error(f"Error fetching open error event: {e}")
+            return None
+
+    def write_error_event(self, mower_id: str, name: str, event: Dict[str, Any],
+                          ended_at: Optional[datetime] = None) -> None:
+        """Write an error incident to InfluxDB.
+
+        The point is keyed on the onset time, so writing it again when the error
+        clears overwrites the open record with its final duration.
+        """
+        error_code = event["error_code"]
+        error_description = ERROR_CODES.get(error_code, f"Unknown error {error_code}")
+        duration = (ended_at - event["started_at"]).total_seconds() if ended_at else 0
+
+        event_point = Point("mower_error_event") \
+            .tag("mower_id", mower_id) \
+            .tag("name", name) \
+            .tag("error", error_description) \
+            .field("error_code", error_code) \
+            .field("duration_seconds", float(duration)) \
+            .field("active", ended_at is None) \
+            .time(event["started_at"])
+
+        if event.get("latitude") is not None and event.get("longitude") is not None:
+            event_point.field("latitude", event["latitude"])
+            event_point.field("longitude", event["longitude"])
+
+        self.write_api.write(bucket=INFLUXDB_BUCKET, record=event_point)
+
+    def track_error_event(self, mower_id: str, name: str, error_code: int,
+                          status_timestamp: datetime, positions: list) -> None:
+        """Detect error onset and clear transitions and record them as incidents."""
+        if mower_id not in self.error_events:
+            self.error_events[mower_id] = self.get_open_error_event(mower_id)
+
+        open_event = self.error_events[mower_id]
+
+        if open_event and open_event["error_code"] == error_code:
+            return
+
+        # The previous error cleared, or was replaced by a different one
+        if open_event:
+            self.write_error_event(mower_id, name, open_event, ended_at=status_timestamp)
+            duration = (status_timestamp - open_event["started_at"]).total_seconds()
+            logger.info("Error %s cleared for mower %s after %.0f seconds", open_event["error_code"], mower_id,
+                        duration, extra={"mower_id": mower_id, "error_code": open_event["error_code"]})
+            self.error_events[mower_id] = None
+
+        if error_code > 0:
+            latitude = longitude = None
+            if positions and "latitude" in positions[0] and "longitude" in positions[0]:
+                latitude = float(positions[0]["latitude"])
+                longitude = float(positions[0]["longitude"])
+
+            new_event = {
+                "error_code": error_code,
+                "started_at": status_timestamp,
+                "latitude": latitude,
+                "longitude": longitude,
+            }
+            self.write_error_event(mower_id, name, new_event)
+            logger.info("Error %s started for mower %s at %s", error_code, mower_id, status_timestamp,
+                        extra={"mower_id": mower_id, "error_code": error_code})
+            self.error_events[mower_id] = new_event
+
+    def get_battery_rollup(self, mower_id: str, day_start: datetime) -> Dict[str, Any]:
+        """Get the stored battery rollup of a mower for the day starting at day_start."""
+        rollup = {
+            "day": day_start,
+            "samples": 0,
+            "battery_sum": 0.0,
+            "battery_min": None,
+            "battery_max": None,
+            "mowing_sessions": 0,
+            "mowing_seconds": 0.0,
+            "drain_percent": 0.0,
+            "charge_cycles": 0,
+            "charge_seconds": 0.0,
+            "charge_percent": 0.0,
+            # Per completed session: drain rate in percent per hour and charge duration in seconds
+            "drain_rate_count": 0,
+            "drain_rate_sum": 0.0,
+            "drain_rate_min": None,
+            "drain_rate_max": None,
+            "charge_duration_count": 0,
+            "charge_duration_sum": 0.0,
+            "charge_duration_min": None,
+            "charge_duration_max": None,
+            "last_sample_ms": None,
+            "last_observed_ms": None,
+            "last_battery_percent": None,
+            "last_activity": None,
+            # Time and battery change so far in the session of the last activity
+            "session_seconds": 0.0,
+            "session_percent": 0.0,
+        }
+
+        try:
+            query = f'''
+            from(bucket: "{INFLUXDB_BUCKET}")
+              |> range(start: {day_start.strftime("%Y-%m-%dT%H:%M:%SZ")}, stop: {(day_start + timedelta(days=1)).strftime("%Y-%m-%dT%H:%M:%SZ")})
+              |> filter(fn: (r) => r._measurement == "mower_battery_daily")
+              |> filter(fn: (r) => r.mower_id == "{mower_id}")
+              |> pivot(rowKey:["_time"], columnKey: ["_field"], valueColumn: "_value")
+            '''
+
+            result = self.query_api.query(query=query, org=INFLUXDB_ORG)
+
+            for table in result:
+                for record in table.records:
+                    for key in rollup:
+                        if key != "day" and record.values.get(key) is not None:
+                            rollup[key] = record.values[key]
+                    logger.info("Resuming battery rollup for mower %s from %s samples", mower_id, rollup["samples"],
+                                extra={"mower_id": mower_id})
+        except Exception as e:
+            logger.error(f"Error fetching battery rollup: {e}")
+
+        return rollup
+
+    def close_battery_session(self, rollup: Dict[str, Any], activity: str,
+                              seconds: float, percent: float) -> None:
+        """Fold a completed mowing or charging session into the rollup's per-session stats."""
+        if seconds <= 0:
+            return
+
+        if activity == "MOWING":
+            key, value = "drain_rate", percent / (seconds / 3600)
+        elif activity == "CHARGING":
+            key, value = "charge_duration", seconds
+        else:
+            return
+
+        rollup[f"{key}_count"] += 1
+        rollup[f"{key}_sum"] += value
+        rollup[f"{key}_min"] = value if rollup[f"{key}_min"] is None else min(rollup[f"{key}_min"], value)
+        rollup[f"{key}_max"] = value if rollup[f"{key}_max"] is None else max(rollup[f"{key}_max"], value)
+
+    def update_battery_rollup(self, mower_id: str, name: str, battery_percent: int,
+                              activity: str, status_timestamp: datetime) -> None:
+        """Fold a status sample into the mower's daily battery rollup and store it.
+
+        Drain is accumulated over intervals that start while MOWING, charge over
+        intervals that start while CHARGING. A session's drain rate or charge
+        duration is recorded on the day the session ends. When the previous sample was
+        last observed more than BATTERY_MAX_GAP seconds ago, the interval since it and
+        its open session are dropped. The rollup point is keyed on the start of the
+        day, so each update overwrites the previous one for that day.
+        """
+        observed = datetime.now(timezone.utc)
+        day_start = status_timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+        rollup = self.battery_rollups.get(mower_id)
+        if rollup is None or rollup["day"] != day_start:
+            rollup = self.get_battery_rollup(mower_id, day_start)
+            self.battery_rollups[mower_id] = rollup
+
+            # After a restart, continue from the last sample stored with today's rollup,
+            # or with yesterday's when nothing has been stored today yet, unless it was
+            # observed too long ago to know what happened since
+            if mower_id not in self.battery_samples:
+                stored = rollup
+                if stored["last_sample_ms"] is None:
+                    stored = self.get_battery_rollup(mower_id, day_start - timedelta(days=1))
+                last_observed_ms = stored["last_observed_ms"]
+                if (last_observed_ms is not None
+                        and observed.timestamp() - last_observed_ms / 1000 <= BATTERY_MAX_GAP):
+                    self.battery_samples[mower_id] = {
+                        "time": datetime.fromtimestamp(stored["last_sample_ms"] / 1000, timezone.utc),
+                        "observed": datetime.fromtimestamp(last_observed_ms / 1000, timezone.utc),
+                        "battery_percent": stored["last_battery_percent"],
+                        "activity": stored["last_activity"],
+                        "session_seconds": stored["session_seconds"],
+                        "session_percent": stored["session_percent"],
+                    }
+
+        previous = self.battery_samples.get(mower_id)
+        if previous and status_timestamp <= previous["time"]:
+            # Status has not changed since the last poll
+            previous["observed"] = observed
+            return
+
+        rollup["samples"] += 1
+        rollup["battery_sum"] += battery_percent
+        rollup["battery_min"] = battery_percent if rollup["battery_min"] is None else min(rollup["battery_min"], battery_percent)
+        rollup["battery_max"] = battery_percent if rollup["battery_max"] is None else max(rollup["battery_max"], battery_percent)
+
+        session_seconds = previous["session_seconds"] if previous else 0.0
+        session_percent = previous["session_percent"] if previous else 0.0
+
+        if previous and (observed - previous["observed"]).total_seconds() > BATTERY_MAX_GAP:
+            # The tracker was not running, so what happened since the previous sample is unknown
+            logger.info("Skipping battery interval for mower %s after a gap since %s", mower_id,
+                        previous["observed"], extra={"mower_id": mower_id})
+            session_seconds = session_percent = 0.0
+        elif previous:
+            elapsed = (status_timestamp - previous["time"]).total_seconds()
+            change = battery_percent - previous["battery_percent"]
+            if previous["activity"] == "MOWING":
+                rollup["mowing_seconds"] += elapsed
+                rollup["drain_percent"] += max(-change, 0)
+                session_seconds += elapsed
+                session_percent += max(-change, 0)
+            elif previous["activity"] == "CHARGING":
+                rollup["charge_seconds"] += elapsed
+                rollup["charge_percent"] += max(change, 0)
+                session_seconds += elapsed
+                session_percent += max(change, 0)
+
+            # The session of the previous activity ends when the activity changes
+            if activity != previous["activity"]:
+                self.close_battery_session(rollup, previous["activity"], session_seconds, session_percent)
+                session_seconds = session_percent = 0.0
+
+        previous_activity = previous["activity"] if previous else None
+        if activity == "MOWING" and previous_activity != "MOWING":
+            rollup["mowing_sessions"] += 1
+        if activity == "CHARGING" and previous_activity != "CHARGING":
+            rollup["charge_cycles"] += 1
+
+        self.battery_samples[mower_id] = {
+            "time": status_timestamp,
+            "observed": observed,
+            "battery_percent": battery_percent,
+            "activity": activity,
+            "session_seconds": session_seconds,
+            "session_percent": session_percent,
+        }
+
+        rollup_point = Point("mower_battery_daily") \
+            .tag("mower_id", mower_id) \
+            .tag("name", name) \
+            .field("samples", int(rollup["samples"])) \
+            .field("battery_sum", float(rollup["battery_sum"])) \
+            .field("battery_min", int(rollup["battery_min"])) \
+            .field("battery_max", int(rollup["battery_max"])) \
+            .field("battery_mean", float(rollup["battery_sum"]) / rollup["samples"]) \
+            .field("mowing_sessions", int(rollup["mowing_sessions"])) \
+            .field("mowing_seconds", float(rollup["mowing_seconds"])) \
+            .field("drain_percent", float(rollup["drain_percent"])) \
+            .field("charge_cycles", int(rollup["charge_cycles"])) \
+            .field("charge_seconds", float(rollup["charge_seconds"])) \
+            .field("charge_percent", float(rollup["charge_percent"])) \
+            .field("drain_rate_count", int(rollup["drain_rate_count"])) \
+            .field("drain_rate_sum", float(rollup["drain_rate_sum"])) \
+            .field("charge_duration_count", int(rollup["charge_duration_count"])) \
+            .field("charge_duration_sum", float(rollup["charge_duration_sum"])) \
+            .field("last_sample_ms", int(status_timestamp.timestamp() * 1000)) \
+            .field("last_observed_ms", int(observed.timestamp() * 1000)) \
+            .field("last_battery_percent", int(battery_percent)) \
+            .field("last_activity", activity) \
+            .field("session_seconds", float(session_seconds)) \
+            .field("session_percent", float(session_percent)) \
+            .time(day_start)
+
+        # Min and max only exist once a session has been completed that day
+        for key in ("drain_rate_min", "drain_rate_max", "charge_duration_min", "charge_duration_max"):
+            if rollup[key] is not None:
+                rollup_point.field(key, float(rollup[key]))
+
+        self.write_api.write(bucket=INFLUXDB_BUCKET, record=rollup_point)
+
     def store_mower_data(self, mower_data: Dict[str, Any]) -> None:
         """Store mower data in InfluxDB."""
 
@@ -212,7 +518,7 @@ class AutomowerTracker:
 
             # Convert milliseconds to datetime object with UTC timezone
             if status_timestamp_ms > 0:
-                logger.info(f"raw status timestamp {status_timestamp_ms}")
+                logger.debug("Raw status timestamp %s", status_timestamp_ms)
                 status_timestamp = datetime.fromtimestamp(status_timestamp_ms / 1000, timezone.utc)
             else:
                 # Fallback to current time if statusTimestamp is not available
@@ -228,9 +534,10 @@ class AutomowerTracker:
             state = mower.get("state", "UNKNOWN")
             error_code = mower.get("errorCode", 0)
 
-            logger.info(f"Mower: {name}, Battery: {battery_percent}%, "
-                        f"Status: {activity}, Error Code: {error_code}")
-            logger.info(f"Status timestamp: {status_timestamp}")
+            logger.info("Mower: %s, Battery: %s%%, Status: %s, Error Code: %s, Status timestamp: %s",
+                        name, battery_percent, activity, error_code, status_timestamp,
+                        extra={"mower_id": mower_id, "battery_percent": battery_percent,
+                               "activity": activity, "error_code": error_code})
 
             # Create status point
             status_point = Point("mower_status") \
@@ -255,21 +562,27 @@ class AutomowerTracker:
                 if key not in ["mode", "activity", "state", "errorCode"] and isinstance(value, (int, float, bool)):
                     status_point.field(key, value)
 
-            # Write status point to InfluxDB
-            self.write_api.write(bucket=INFLUXDB_BUCKET, record=status_point)
+            # Record error onset and clear transitions as incidents
+            with self.profiler.stage("track_error_event"):
+                self.track_error_event(mower_id, name, error_code, status_timestamp, positions)
+
+            # Maintain the daily battery and charging rollup
+            with self.profiler.stage("update_battery_rollup"):
+                self.update_battery_rollup(mower_id, name, battery_percent, activity, status_timestamp)
 
             # Only process position data if the mower is actually mowing
             if activity == "MOWING":
                 # Create position points if available
                 if positions and len(positions) > 0:
-                    logger.info(f"Processing {len(positions)} position points for MOWING status")
+                    logger.debug("Processing %d position points for MOWING status", len(positions))
 
                     # Get the last position timestamp from InfluxDB
-                    last_position_timestamp = self.get_last_position_timestamp(mower_id)
-                    logger.info(f"Last stored position timestamp: {last_position_timestamp}")
+                    with self.profiler.stage("get_last_position_timestamp"):
+                        last_position_timestamp = self.get_last_position_timestamp(mower_id)
 
                     # Track the latest position timestamp we've processed in this batch
                     latest_processed_timestamp = None
+                    position_points = []
 
                     # The positions array is ordered with most recent position first
                     # Each position is POSITION_INTERVAL seconds apart
@@ -285,12 +598,14 @@ class AutomowerTracker:
 
                             # Skip if this position is older than or equal to the last stored position
                             if last_position_timestamp and position_timestamp <= last_position_timestamp:
-                                logger.info(f"Skipping position at {position_timestamp} as it's not newer than last stored position")
+                                logger.debug("Skipping position at %s as it's not newer than last stored position",
+                                             position_timestamp)
                                 continue
 
                             # Skip if this position is within 5 seconds of the latest processed position
                             if latest_processed_timestamp and abs((latest_processed_timestamp - position_timestamp).total_seconds()) < 5:
-                                logger.info(f"Skipping position at {position_timestamp} as it's within 5 seconds of latest processed position")
+                                logger.debug("Skipping position at %s as it's within 5 seconds of latest processed position",
+                                             position_timestamp)
                                 continue
 
                             position_point = Point("mower_position") \
@@ -307,23 +622,36 @@ class AutomowerTracker:
                                 position_point.tag("error", error_description)
                                 position_point.field("error_code", error_code)
 
-                            # Write position point to InfluxDB
-                            self.write_api.write(bucket=INFLUXDB_BUCKET, record=position_point)
+                            position_points.append(position_point)
 
                             # Update the latest processed timestamp
                             if latest_processed_timestamp is None or position_timestamp > latest_processed_timestamp:
                                 latest_processed_timestamp = position_timestamp
 
                             if i == 0:  # Only log the most recent position to avoid excessive logging
-                                logger.info(f"Most recent position: {lat}, {lon} at {position_timestamp}")
+                                logger.info("Most recent position: %s, %s at %s", lat, lon, position_timestamp,
+                                            extra={"mower_id": mower_id})
                         else:
                             logger.warning(f"Position data incomplete for position {i}")
+
+                    # Write all new position points to InfluxDB in one request
+                    if position_points:
+                        with self.profiler.stage("write_positions"):
+                            self.write_api.write(bucket=INFLUXDB_BUCKET, record=position_points)
+                        if last_position_timestamp is None or latest_processed_timestamp > last_position_timestamp:
+                            self.last_position_timestamps[mower_id] = latest_processed_timestamp
                 else:
                     logger.warning("No position data available while mower is MOWING")
             else:
-                logger.info(f"Skipping position tracking as mower is not MOWING (current activity: {activity})")
+                logger.info("Skipping position tracking as mower is not MOWING (current activity: %s)", activity)
 
-            logger.info(f"Stored data for mower {mower_id}")
+            # Write status point to InfluxDB last: the frontend uses its time as the
+            # watermark for cached responses, so it must not appear before the
+            # positions, incidents and rollup of the same poll are stored
+            with self.profiler.stage("write_status"):
+                self.write_api.write(bucket=INFLUXDB_BUCKET, record=status_point)
+
+            logger.info("Stored data for mower %s", mower_id, extra={"mower_id": mower_id})
 
         except Exception as e:
             logger.error(f"Error storing mower data: {e}")
@@ -332,18 +660,22 @@ class AutomowerTracker:
         """Poll for mower data at regular intervals."""
         while self.running:
             try:
-                # Get list of mowers
-                mowers = self.get_mowers()
-
-                for mower in mowers:
-                    mower_id = mower.get("id")
-                    # Get detailed information for each mower
-                    mower_details = self.get_mower_details(mower_id)
-                    if mower_details:
-                        self.store_mower_data(mower_details)
+                with self.profiler.cycle():
+                    # Get list of mowers
+                    with self.profiler.stage("get_mowers"):
+                        mowers = self.get_mowers()
+
+                    for mower in mowers:
+                        mower_id = mower.get("id")
+                        # Get detailed information for each mower
+                        with self.profiler.stage("get_mower_details"):
+                            mower_details = self.get_mower_details(mower_id)
+                        if mower_details:
+                            with self.profiler.stage("store_mower_data"):
+                                self.store_mower_data(mower_details)
 
                 # Sleep for the polling interval
-                logger.info(f"Sleeping for {POLL_INTERVAL} seconds before next poll")
+                logger.info("Sleeping for %d seconds before next poll", POLL_INTERVAL)
                 time.sleep(POLL_INTERVAL)
             except Exception as e:
                 logger.error(f"Error during polling: {e}")
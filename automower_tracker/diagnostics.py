@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Automower Diagnostics - Rate-limited, sampled logging for hot paths and an
+opt-in profiling mode for the tracker's poll cycle.
+
+Profiling is enabled with the AUTOMOWER_PROFILE environment variable, so it
+can be switched on in production without code changes.
+"""
+
+import os
+import json
+import time
+import pstats
+import logging
+import cProfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Tuple
+
+# Logging configuration
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+LOG_RATE_LIMIT = int(os.getenv("LOG_RATE_LIMIT", "10"))
+LOG_RATE_WINDOW = float(os.getenv("LOG_RATE_WINDOW", "60"))
+LOG_SAMPLE_EVERY = int(os.getenv("LOG_SAMPLE_EVERY", "100"))
+
+# Profiling configuration
+PROFILE_ENABLED = os.getenv("AUTOMOWER_PROFILE", "").lower() in ("1", "true", "yes")
+PROFILE_DIR = os.getenv("AUTOMOWER_PROFILE_DIR", "profiles")
+PROFILE_EVERY = int(os.getenv("AUTOMOWER_PROFILE_EVERY", "10"))
+PROFILE_KEEP = int(os.getenv("AUTOMOWER_PROFILE_KEEP", "20"))
+
+# Attributes every LogRecord has, everything else was passed through `extra`
+STANDARD_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+logger = logging.getLogger("automower_diagnostics")
+
+
+class RateLimitFilter(logging.Filter):
+    """Limit how often the same log message is emitted.
+
+    Messages are grouped by their unformatted template, so callers should use
+    %-style arguments rather than f-strings. Within each window the first
+    `limit` records of a template pass, after that one in `sample_every`. The
+    next record that passes reports how many were suppressed. Warnings and
+    errors are never limited. Counters whose window has expired are dropped
+    once per window, so templates that stop recurring do not accumulate.
+    """
+
+    def __init__(self, limit: int = LOG_RATE_LIMIT, window: float = LOG_RATE_WINDOW,
+                 sample_every: int = LOG_SAMPLE_EVERY):
+        super().__init__()
+        self.limit = limit
+        self.window = window
+        self.sample_every = sample_every
+        self.lock = threading.Lock()
+        # (logger name, template) -> [window start, count in window, suppressed since last emitted]
+        self.counters: Dict[Tuple[str, str], list] = {}
+        self.next_sweep = time.monotonic() + window
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+
+        key = (record.name, str(record.msg))
+        now = time.monotonic()
+
+        with self.lock:
+            if now >= self.next_sweep:
+                self.sweep(now)
+
+            counter = self.counters.get(key)
+            if counter is None or now - counter[0] >= self.window:
+                suppressed = counter[2] if counter else 0
+                counter = [now, 0, suppressed]
+                self.counters[key] = counter
+
+            counter[1] += 1
+            count = counter[1]
+            if count > self.limit and (count - self.limit) % self.sample_every != 0:
+                counter[2] += 1
+                return False
+
+            suppressed = counter[2]
+            counter[2] = 0
+
+        if suppressed:
+            record.msg = f"{record.getMessage()} [{suppressed} similar messages suppressed]"
+            record.args = ()
+            record.suppressed = suppressed
+        return True
+
+    def sweep(self, now: float) -> None:
+        """Drop the counters whose window has expired. Called with the lock held."""
+        self.counters = {key: counter for key, counter in self.counters.items()
+                         if now - counter[0] < self.window}
+        self.next_sweep = now + self.window
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line, including `extra` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in STANDARD_RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_logging(level: int = logging.INFO) -> None:
+    """Set up the root handler with the configured format and rate limiting."""
+    handler = logging.StreamHandler()
+    if LOG_FORMAT == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+    handler.addFilter(RateLimitFilter())
+    logging.basicConfig(level=level, handlers=[handler])
+
+
+class Profiler:
+    """Per-stage timings for each poll cycle, and periodic cProfile dumps.
+
+    When disabled, `cycle()` and `stage()` do nothing beyond entering a
+    context manager.
+    """
+
+    def __init__(self, enabled: bool = PROFILE_ENABLED, directory: str = PROFILE_DIR,
+                 every: int = PROFILE_EVERY, keep: int = PROFILE_KEEP):
+        self.enabled = enabled
+        self.directory = directory
+        self.every = max(every, 1)
+        self.keep = keep
+        self.cycles = 0
+        self.timings: Dict[str, list] = {}
+
+        if self.enabled:
+            os.makedirs(self.directory, exist_ok=True)
+            logger.info("Profiling enabled, dumping a cProfile of every %dth poll cycle to %s",
+                        self.every, self.directory)
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a stage of the current poll cycle."""
+        if not self.enabled:
+            yield
+            return
+
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            timing = self.timings.setdefault(name, [0, 0.0])
+            timing[0] += 1
+            timing[1] += time.perf_counter() - started
+
+    @contextmanager
+    def cycle(self):
+        """Profile one poll cycle: log its stage timings and periodically dump a cProfile."""
+        if not self.enabled:
+            yield
+            return
+
+        self.cycles += 1
+        self.timings = {}
+        profile = cProfile.Profile() if self.cycles % self.every == 1 or self.every == 1 else None
+        started = time.perf_counter()
+
+        if profile:
+            profile.enable()
+        try:
+            yield
+        finally:
+            if profile:
+                profile.disable()
+            total = time.perf_counter() - started
+
+            stages = ", ".join(f"{name}={seconds * 1000:.1f}ms/{count}"
+                               for name, (count, seconds) in sorted(self.timings.items()))
+            logger.info("Poll cycle %d took %.1fms: %s", self.cycles, total * 1000, stages,
+                        extra={"cycle": self.cycles, "duration_ms": round(total * 1000, 1),
+                               "stages": {name: round(seconds * 1000, 1)
+                                          for name, (_, seconds) in self.timings.items()}})
+
+            if profile:
+                self.dump(profile)
+
+    def dump(self, profile: cProfile.Profile) -> None:
+        """Write a cProfile dump and a readable summary of the slowest functions."""
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        path = os.path.join(self.directory, f"poll-{stamp}-{self.cycles}")
+
+        try:
+            profile.dump_stats(f"{path}.prof")
+            with open(f"{path}.txt", "w") as f:
+                pstats.Stats(profile, stream=f).sort_stats("cumulative").print_stats(40)
+            logger.info("Wrote poll cycle profile to %s.prof", path)
+        except OSError as e:
+            logger.warning(f"Failed to write profile: {e}")
+
+        self.prune()
+
+    def prune(self) -> None:
+        """Remove all but the `keep` most recent dumps. A `keep` of 0 or less keeps all of them."""
+        if self.keep <= 0:
+            return
+
+        try:
+            dumps = [entry for entry in os.scandir(self.directory)
+                     if entry.name.startswith("poll-") and entry.name.endswith(".prof")]
+        except OSError as e:
+            logger.warning(f"Failed to list profiles: {e}")
+            return
+
+        dumps.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in dumps[:-self.keep]:
+            base = entry.path[:-len(".prof")]
+            for path in (f"{base}.prof", f"{base}.txt"):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    continue
+                except OSError as e:
+                    logger.warning(f"Failed to remove old profile {path}: {e}")
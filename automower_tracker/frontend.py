@@ -5,17 +5,26 @@ Automower location and status data stored in InfluxDB.
 """
 
 import os
-from datetime import datetime, timedelta
+import json
+import time
+import hashlib
+import functools
+from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Any, Optional
 
 import dotenv
+import numpy as np
 from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import HTMLResponse
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from influxdb_client import InfluxDBClient
 import uvicorn
 
+from response_cache import SharedCache
+from zones import load_zones, ZoneStatsCache, day_start
+
 # Load environment variables
 dotenv.load_dotenv()
 
@@ -25,6 +34,18 @@ INFLUXDB_TOKEN = os.getenv("INFLUXDB_TOKEN")
 INFLUXDB_ORG = os.getenv("INFLUXDB_ORG")
 INFLUXDB_BUCKET = os.getenv("INFLUXDB_BUCKET", "automower")
 
+# Shared response cache, readable by every worker process
+CACHE_DIR = os.getenv("CACHE_DIR", "/tmp/automower_cache")
+
+# Seconds after which relative time windows are re-evaluated even without new writes
+CACHE_WINDOW = 300
+
+# Seconds a looked-up write watermark is reused before querying it again
+WATERMARK_TTL = 10
+
+# Number of uvicorn worker processes
+FRONTEND_WORKERS = int(os.getenv("FRONTEND_WORKERS", "1"))
+
 # Create FastAPI app
 app = FastAPI(title="Automower Tracker", description="Visualize Automower location and status")
 
@@ -42,13 +63,114 @@ influx_client = InfluxDBClient(
 )
 query_api = influx_client.query_api()
 
+response_cache = SharedCache(CACHE_DIR, max_age=2 * CACHE_WINDOW)
+
+# Minimum on-screen distance in pixels between returned positions when a zoom level is given
+THIN_PIXELS = 2
+
+# Largest gap in seconds between two fixes that is still drawn as a connected path
+PATH_MAX_GAP = 90
+
+# On-screen size in pixels of the grid cells that positions are counted in for the heatmap
+DENSITY_PIXELS = 5
+
+# Playback: mower time queried per InfluxDB request, largest gap in seconds between two
+# fixes that is still interpolated, frames per streamed chunk and frames per request
+PLAYBACK_WINDOW = 3600
+PLAYBACK_MAX_GAP = 90
+PLAYBACK_CHUNK_FRAMES = 500
+PLAYBACK_MAX_FRAMES = 500000
+
+# Seconds before the previous zone stats refresh from which mowers without cached data are read
+ZONE_NEW_MOWER_WINDOW = 86400
+
+# Lawn zones and their incrementally maintained statistics
+zones = load_zones()
+zone_stats_cache = ZoneStatsCache(zones)
+
+def position_bounds_filter(min_lat: Optional[float], min_lon: Optional[float],
+                           max_lat: Optional[float], max_lon: Optional[float]) -> str:
+    """Build the Flux filter limiting pivoted positions to a bounding box, if one is given."""
+    if None in (min_lat, min_lon, max_lat, max_lon):
+        return ""
+    return (f'|> filter(fn: (r) => r.latitude >= {min_lat} and r.latitude <= {max_lat} '
+            f'and r.longitude >= {min_lon} and r.longitude <= {max_lon})')
+
+def get_write_watermarks() -> Dict[str, str]:
+    """Get the time of the latest status write per mower.
+
+    Every poll writes a status point after everything else it stores, so this
+    changes whenever new data is stored and only once all of it is readable.
+    """
+    watermarks = response_cache.get("watermarks", max_age=WATERMARK_TTL)
+    if watermarks is not None:
+        return watermarks
+
+    query = f'''
+    from(bucket: "{INFLUXDB_BUCKET}")
+        |> range(start: -30d)
+        |> filter(fn: (r) => r._measurement == "mower_status" and r._field == "battery_percent")
+        |> last()
+        |> keep(columns: ["_time", "mower_id"])
+    '''
+
+    result = query_api.query(query)
+    watermarks = {}
+
+    for table in result:
+        for record in table.records:
+            mower_id = record.values.get("mower_id")
+            written = record.get_time().isoformat()
+            if written > watermarks.get(mower_id, ""):
+                watermarks[mower_id] = written
+
+    response_cache.set("watermarks", watermarks)
+    return watermarks
+
+def conditional_get(endpoint):
+    """Serve a JSON endpoint with ETag validation and the shared response cache.
+
+    The ETag covers the request URL, the write watermark of the requested mower
+    (or of all mowers) and the current CACHE_WINDOW, so it changes when new data
+    is stored or a relative time range has moved on.
+    """
+    @functools.wraps(endpoint)
+    async def wrapper(**kwargs):
+        request = kwargs["request"]
+        mower_id = kwargs.get("mower_id")
+
+        try:
+            watermarks = get_write_watermarks()
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error querying InfluxDB: {str(e)}")
+
+        watermark = watermarks.get(mower_id, "") if mower_id else max(watermarks.values(), default="")
+        window = int(time.time() // CACHE_WINDOW)
+        key = f"{request.url.path}?{request.url.query}|{watermark}|{window}"
+        etag = f'"{hashlib.sha1(key.encode()).hexdigest()}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+        if_none_match = request.headers.get("if-none-match", "")
+        if etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]:
+            return Response(status_code=304, headers=headers)
+
+        body = response_cache.get(etag)
+        if body is None:
+            body = json.dumps(jsonable_encoder(await endpoint(**kwargs)))
+            response_cache.set(etag, body)
+
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    return wrapper
+
 @app.get("/", response_class=HTMLResponse)
 async def index(request: Request):
     """Render the main page with the map."""
     return templates.TemplateResponse("index.html", {"request": request})
 
 @app.get("/api/mowers")
-async def get_mowers():
+@conditional_get
+async def get_mowers(request: Request):
     """Get a list of all mowers."""
     query = '''
 from(bucket: "automower")
@@ -78,44 +200,179 @@ from(bucket: "automower")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error querying InfluxDB: {str(e)}")
 @app.get("/api/positions")
-async def get_positions(hours: int = 24, mower_id: Optional[str] = None):
-    """Get mower positions for the specified time range."""
+@conditional_get
+async def get_positions(request: Request, hours: int = 24, mower_id: Optional[str] = None,
+                        min_lat: Optional[float] = None, min_lon: Optional[float] = None,
+                        max_lat: Optional[float] = None, max_lon: Optional[float] = None,
+                        zoom: Optional[int] = None):
+    """Get mower positions for the specified time range.
+
+    When a bounding box is given only positions inside it are returned, and when
+    a map zoom level is given positions closer together than THIN_PIXELS at that
+    zoom are thinned out along each mower's track. With a zoom level, a position
+    that follows more than PATH_MAX_GAP seconds without fixes (for example after
+    the track left the bounding box) is marked with new_segment.
+    """
     time_range = f"-{hours}h"
 
     mower_filter = ""
     if mower_id:
         mower_filter = f'|> filter(fn: (r) => r.mower_id == "{mower_id}")'
 
+    bounds_filter = position_bounds_filter(min_lat, min_lon, max_lat, max_lon)
+
+    sort = ""
+    if zoom is not None:
+        sort = '|> group(columns: ["mower_id"]) |> sort(columns: ["_time"])'
+
     query = f'''
     from(bucket: "{INFLUXDB_BUCKET}")
         |> range(start: {time_range})
         |> filter(fn: (r) => r._measurement == "mower_position")
         {mower_filter}
         |> pivot(rowKey:["_time"], columnKey: ["_field"], valueColumn: "_value")
+        {bounds_filter}
+        |> keep(columns: ["_time", "mower_id", "name", "latitude", "longitude", "error_code"])
+        {sort}
     '''
 
     try:
         result = query_api.query(query)
         positions = []
 
+        # Grid cell size in degrees that covers THIN_PIXELS on screen at this zoom
+        cell_size = THIN_PIXELS * 360 / (256 * 2 ** zoom) if zoom is not None else None
+
         for table in result:
+            last_cell = None
+            last_time = None
             for record in table.records:
+                latitude = record.values.get("latitude")
+                longitude = record.values.get("longitude")
+
+                # Compare with the previous fix read, thinned out or not, to find gaps in the track
+                new_segment = False
+                if zoom is not None:
+                    record_time = record.get_time()
+                    new_segment = last_time is not None and (record_time - last_time).total_seconds() > PATH_MAX_GAP
+                    last_time = record_time
+
+                if cell_size:
+                    cell = (int(latitude // cell_size), int(longitude // cell_size))
+                    error_code = record.values.get("error_code") or 0
+                    # Always keep error positions so they stay visible when zoomed out
+                    if cell == last_cell and error_code == 0 and not new_segment:
+                        continue
+                    last_cell = cell
+
                 position = {
                     "time": record.get_time().isoformat(),
                     "mower_id": record.values.get("mower_id"),
                     "name": record.values.get("name", "Unknown"),
-                    "latitude": record.values.get("latitude"),
-                    "longitude": record.values.get("longitude"),
+                    "latitude": latitude,
+                    "longitude": longitude,
                     "error_code": record.values.get("error_code", 0)
                 }
+                if new_segment:
+                    position["new_segment"] = True
                 positions.append(position)
 
         return positions
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error querying InfluxDB: {str(e)}")
 
+@app.get("/api/positions/density")
+@conditional_get
+async def get_positions_density(request: Request, hours: int = 24, mower_id: Optional[str] = None,
+                                min_lat: Optional[float] = None, min_lon: Optional[float] = None,
+                                max_lat: Optional[float] = None, max_lon: Optional[float] = None,
+                                zoom: int = 17):
+    """Count positions per grid cell for the heatmap.
+
+    Takes the same filters as /api/positions, but nothing is thinned out, so the
+    counts show where the mowers spent their time. Cells are DENSITY_PIXELS wide
+    on screen at the given zoom level.
+    """
+    time_range = f"-{hours}h"
+
+    mower_filter = ""
+    if mower_id:
+        mower_filter = f'|> filter(fn: (r) => r.mower_id == "{mower_id}")'
+
+    bounds_filter = position_bounds_filter(min_lat, min_lon, max_lat, max_lon)
+
+    query = f'''
+    from(bucket: "{INFLUXDB_BUCKET}")
+        |> range(start: {time_range})
+        |> filter(fn: (r) => r._measurement == "mower_position")
+        {mower_filter}
+        |> filter(fn: (r) => r._field == "latitude" or r._field == "longitude")
+        |> pivot(rowKey:["_time"], columnKey: ["_field"], valueColumn: "_value")
+        {bounds_filter}
+        |> keep(columns: ["latitude", "longitude"])
+    '''
+
+    try:
+        result = query_api.query(query)
+        lats = np.array([record.values.get("latitude") for table in result for record in table.records], dtype=float)
+        lons = np.array([record.values.get("longitude") for table in result for record in table.records], dtype=float)
+        if len(lats) == 0:
+            return []
+
+        cell_size = DENSITY_PIXELS * 360 / (256 * 2 ** zoom)
+        cells = np.stack([np.floor(lats / cell_size), np.floor(lons / cell_size)], axis=1)
+        cells, counts = np.unique(cells, axis=0, return_counts=True)
+
+        return [
+            {
+                "latitude": (cell_lat + 0.5) * cell_size,
+                "longitude": (cell_lon + 0.5) * cell_size,
+                "count": int(count)
+            }
+            for (cell_lat, cell_lon), count in zip(cells.tolist(), counts)
+        ]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error querying InfluxDB: {str(e)}")
+
+@app.get("/api/positions/bounds")
+@conditional_get
+async def get_positions_bounds(request: Request, hours: int = 24, mower_id: Optional[str] = None):
+    """Get the bounding box of mower positions for the specified time range."""
+    time_range = f"-{hours}h"
+
+    mower_filter = ""
+    if mower_id:
+        mower_filter = f'|> filter(fn: (r) => r.mower_id == "{mower_id}")'
+
+    query = f'''
+    data = from(bucket: "{INFLUXDB_BUCKET}")
+        |> range(start: {time_range})
+        |> filter(fn: (r) => r._measurement == "mower_position")
+        {mower_filter}
+        |> filter(fn: (r) => r._field == "latitude" or r._field == "longitude")
+        |> group(columns: ["_field"])
+
+    data |> min() |> yield(name: "min")
+    data |> max() |> yield(name: "max")
+    '''
+
+    try:
+        result = query_api.query(query)
+        bounds = {}
+
+        for table in result:
+            for record in table.records:
+                prefix = record.values.get("result")
+                field = "lat" if record.get_field() == "latitude" else "lon"
+                bounds[f"{prefix}_{field}"] = record.get_value()
+
+        return bounds
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error querying InfluxDB: {str(e)}")
+
 @app.get("/api/status/{mower_id}")
-async def get_mower_status(mower_id: str):
+@conditional_get
+async def get_mower_status(request: Request, mower_id: str):
     """Get the latest status for a specific mower."""
     query = f'''
     from(bucket: "{INFLUXDB_BUCKET}")
@@ -155,5 +412,391 @@ async def get_mower_status(mower_id: str):
             raise e
         raise HTTPException(status_code=500, detail=f"Error querying InfluxDB: {str(e)}")
 
+@app.get("/api/errors")
+@conditional_get
+async def get_errors(request: Request, hours: int = 24 * 30, mower_id: Optional[str] = None,
+                     error_code: Optional[int] = None, limit: int = 100, offset: int = 0):
+    """Get error incidents for the specified time range, most recent first."""
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be at least 1")
+    if offset < 0:
+        raise HTTPException(status_code=400, detail="offset must not be negative")
+
+    time_range = f"-{hours}h"
+
+    mower_filter = ""
+    if mower_id:
+        mower_filter = f'|> filter(fn: (r) => r.mower_id == "{mower_id}")'
+
+    error_filter = ""
+    if error_code is not None:
+        error_filter = f'|> filter(fn: (r) => r.error_code == {error_code})'
+
+    query = f'''
+    from(bucket: "{INFLUXDB_BUCKET}")
+        |> range(start: {time_range})
+        |> filter(fn: (r) => r._measurement == "mower_error_event")
+        {mower_filter}
+        |> pivot(rowKey:["_time"], columnKey: ["_field"], valueColumn: "_value")
+        {error_filter}
+        |> group()
+        |> sort(columns: ["_time"], desc: true)
+        |> limit(n: {limit}, offset: {offset})
+    '''
+
+    try:
+        result = query_api.query(query)
+        errors = []
+
+        for table in result:
+            for record in table.records:
+                error = {
+                    "time": record.get_time().isoformat(),
+                    "mower_id": record.values.get("mower_id"),
+                    "name": record.values.get("name", "Unknown"),
+                    "error_code": record.values.get("error_code", 0),
+                    "error": record.values.get("error", ""),
+                    "latitude": record.values.get("latitude"),
+                    "longitude": record.values.get("longitude"),
+                    "duration_seconds": record.values.get("duration_seconds", 0),
+                    "active": record.values.get("active", False)
+                }
+                errors.append(error)
+
+        return errors
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error querying InfluxDB: {str(e)}")
+
+def round_or_none(value: Optional[float], digits: int, divisor: float = 1) -> Optional[float]:
+    """Round value / divisor, passing None through."""
+    return None if value is None else round(value / divisor, digits)
+
+@app.get("/api/battery")
+@conditional_get
+async def get_battery(request: Request, days: int = 365, mower_id: Optional[str] = None):
+    """Get daily battery and charging rollups for the last days, oldest first."""
+    mower_filter = ""
+    if mower_id:
+        mower_filter = f'|> filter(fn: (r) => r.mower_id == "{mower_id}")'
+
+    query = f'''
+    from(bucket: "{INFLUXDB_BUCKET}")
+        |> range(start: -{days}d)
+        |> filter(fn: (r) => r._measurement == "mower_battery_daily")
+        {mower_filter}
+        |> pivot(rowKey:["_time"], columnKey: ["_field"], valueColumn: "_value")
+        |> group()
+        |> sort(columns: ["_time"])
+    '''
+
+    try:
+        result = query_api.query(query)
+        rollups = []
+
+        for table in result:
+            for record in table.records:
+                mowing_hours = (record.values.get("mowing_seconds") or 0) / 3600
+                charge_hours = (record.values.get("charge_seconds") or 0) / 3600
+                drain_percent = record.values.get("drain_percent") or 0
+                charge_percent = record.values.get("charge_percent") or 0
+                drain_rates = record.values.get("drain_rate_count") or 0
+                charge_durations = record.values.get("charge_duration_count") or 0
+
+                rollup = {
+                    "day": record.get_time().date().isoformat(),
+                    "mower_id": record.values.get("mower_id"),
+                    "name": record.values.get("name", "Unknown"),
+                    "battery_min": record.values.get("battery_min"),
+                    "battery_max": record.values.get("battery_max"),
+                    "battery_mean": record.values.get("battery_mean"),
+                    "mowing_sessions": record.values.get("mowing_sessions", 0),
+                    "mowing_hours": round(mowing_hours, 2),
+                    "drain_percent": drain_percent,
+                    "drain_per_mowing_hour": round(drain_percent / mowing_hours, 2) if mowing_hours else None,
+                    "charge_cycles": record.values.get("charge_cycles", 0),
+                    "charge_hours": round(charge_hours, 2),
+                    "charge_per_hour": round(charge_percent / charge_hours, 2) if charge_hours else None,
+                    "session_drain_rate_min": round_or_none(record.values.get("drain_rate_min"), 2),
+                    "session_drain_rate_mean": round(record.values["drain_rate_sum"] / drain_rates, 2)
+                                               if drain_rates else None,
+                    "session_drain_rate_max": round_or_none(record.values.get("drain_rate_max"), 2),
+                    "charge_minutes_min": round_or_none(record.values.get("charge_duration_min"), 1, 60),
+                    "charge_minutes_mean": round(record.values["charge_duration_sum"] / charge_durations / 60, 1)
+                                           if charge_durations else None,
+                    "charge_minutes_max": round_or_none(record.values.get("charge_duration_max"), 1, 60)
+                }
+                rollups.append(rollup)
+
+        return rollups
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error querying InfluxDB: {str(e)}")
+
+def flux_time(value: datetime) -> str:
+    """Format a datetime as a Flux time literal."""
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+def load_zone_positions(start: datetime, stop: Optional[datetime] = None,
+                        mower_filter: str = "") -> Dict[str, datetime]:
+    """Fold positions stored in [start, stop) into the zone stats cache.
+
+    mower_filter is an optional Flux filter limiting which mowers are read.
+    Returns the timestamp of the newest position read per mower.
+    """
+    stop_clause = f", stop: {flux_time(stop)}" if stop else ""
+    query = f'''
+    from(bucket: "{INFLUXDB_BUCKET}")
+        |> range(start: {flux_time(start)}{stop_clause})
+        |> filter(fn: (r) => r._measurement == "mower_position")
+        {mower_filter}
+        |> filter(fn: (r) => r._field == "latitude" or r._field == "longitude")
+        |> pivot(rowKey:["_time"], columnKey: ["_field"], valueColumn: "_value")
+        |> group(columns: ["mower_id"])
+        |> sort(columns: ["_time"])
+    '''
+
+    result = query_api.query(query)
+    newest = {}
+
+    for table in result:
+        if not table.records:
+            continue
+        first = table.records[0]
+        mower_id = first.values.get("mower_id")
+        times = np.array([record.get_time().timestamp() for record in table.records])
+        lats = np.array([record.values.get("latitude") for record in table.records], dtype=float)
+        lons = np.array([record.values.get("longitude") for record in table.records], dtype=float)
+        zone_stats_cache.add_positions(mower_id, first.values.get("name"), times, lats, lons)
+
+        table_newest = table.records[-1].get_time()
+        newest[mower_id] = max(table_newest, newest.get(mower_id, table_newest))
+
+    return newest
+
+def load_zone_errors(start: datetime, stop: Optional[datetime] = None,
+                     mower_filter: str = "") -> Dict[str, datetime]:
+    """Fold error incidents that started in [start, stop) into the zone stats cache.
+
+    mower_filter is an optional Flux filter limiting which mowers are read.
+    Returns the onset time of the newest incident read per mower.
+    """
+    stop_clause = f", stop: {flux_time(stop)}" if stop else ""
+    query = f'''
+    from(bucket: "{INFLUXDB_BUCKET}")
+        |> range(start: {flux_time(start)}{stop_clause})
+        |> filter(fn: (r) => r._measurement == "mower_error_event")
+        {mower_filter}
+        |> filter(fn: (r) => r._field == "latitude" or r._field == "longitude")
+        |> pivot(rowKey:["_time"], columnKey: ["_field"], valueColumn: "_value")
+        |> group(columns: ["mower_id"])
+    '''
+
+    result = query_api.query(query)
+    newest = {}
+
+    for table in result:
+        if not table.records:
+            continue
+        first = table.records[0]
+        mower_id = first.values.get("mower_id")
+        times = np.array([record.get_time().timestamp() for record in table.records])
+        lats = np.array([record.values.get("latitude") for record in table.records], dtype=float)
+        lons = np.array([record.values.get("longitude") for record in table.records], dtype=float)
+        zone_stats_cache.add_errors(mower_id, first.values.get("name"), times, lats, lons)
+
+        table_newest = max(record.get_time() for record in table.records)
+        newest[mower_id] = max(table_newest, newest.get(mower_id, table_newest))
+
+    return newest
+
+def refresh_zone_stats(start: datetime) -> None:
+    """Make sure the zone stats cache covers everything stored since start."""
+    cache = zone_stats_cache
+    now = datetime.now(timezone.utc)
+
+    # Load whole days before the span that is already cached
+    if cache.covered_from is None or start < cache.covered_from:
+        stop = cache.covered_from
+        newest_positions = load_zone_positions(start, stop)
+        newest_errors = load_zone_errors(start, stop)
+        if stop is None:
+            cache.position_watermarks = newest_positions
+            cache.error_watermarks = newest_errors
+            cache.refreshed_at = now
+        cache.covered_from = start
+
+    # Data of mowers not seen yet was stored since the previous refresh, but carries
+    # the mower's own clock, so look back a little further than that
+    new_mower_start = max(cache.covered_from, cache.refreshed_at - timedelta(seconds=ZONE_NEW_MOWER_WINDOW))
+
+    for watermarks, load in ((cache.position_watermarks, load_zone_positions),
+                             (cache.error_watermarks, load_zone_errors)):
+        # Top up each known mower from its own watermark, as position times come from
+        # each mower's clock and an idle mower must not hold back the others
+        for mower_id, watermark in list(watermarks.items()):
+            watermarks.update(load(watermark + timedelta(microseconds=1),
+                                   mower_filter=f'|> filter(fn: (r) => r.mower_id == "{mower_id}")'))
+
+        known = ", ".join(f'"{mower_id}"' for mower_id in watermarks)
+        new_mower_filter = f'|> filter(fn: (r) => not contains(value: r.mower_id, set: [{known}]))' if known else ""
+        watermarks.update(load(new_mower_start, mower_filter=new_mower_filter))
+
+    cache.refreshed_at = now
+
+@app.get("/api/zones/stats")
+async def get_zone_stats(days: int = 30, mower_id: Optional[str] = None):
+    """Get time spent, distance mowed and error counts per zone for the last days."""
+    if not zones:
+        raise HTTPException(status_code=404, detail="No zones configured")
+    if days < 1:
+        raise HTTPException(status_code=400, detail="days must be at least 1")
+
+    today = datetime.now(timezone.utc).date()
+    day_list = [today - timedelta(days=i) for i in range(days)]
+
+    try:
+        refresh_zone_stats(day_start(day_list[-1]))
+        return zone_stats_cache.summarize(day_list, mower_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error querying InfluxDB: {str(e)}")
+
+def status_summary(record) -> Dict[str, Any]:
+    """Extract the status values shown during playback from a pivoted status record."""
+    return {
+        "activity": record.values.get("activity", "UNKNOWN"),
+        "state": record.values.get("state", "UNKNOWN"),
+        "battery_percent": record.values.get("battery_percent", 0),
+        "error_code": record.values.get("error_code", 0),
+        "error": record.values.get("error", "")
+    }
+
+def query_playback_statuses(mower_id: str, start: datetime, stop: datetime,
+                            latest_only: bool = False) -> List[tuple]:
+    """Get (epoch seconds, status) pairs of a mower in [start, stop), oldest first."""
+    latest = '|> sort(columns: ["_time"], desc: true) |> limit(n: 1)' if latest_only else '|> sort(columns: ["_time"])'
+    query = f'''
+    from(bucket: "{INFLUXDB_BUCKET}")
+        |> range(start: {flux_time(start)}, stop: {flux_time(stop)})
+        |> filter(fn: (r) => r._measurement == "mower_status")
+        |> filter(fn: (r) => r.mower_id == "{mower_id}")
+        |> filter(fn: (r) => r._field == "battery_percent" or r._field == "error_code")
+        |> pivot(rowKey:["_time"], columnKey: ["_field"], valueColumn: "_value")
+        |> group()
+        {latest}
+    '''
+
+    result = query_api.query(query)
+    return [(record.get_time().timestamp(), status_summary(record))
+            for table in result for record in table.records]
+
+def query_playback_positions(mower_id: str, start: datetime, stop: datetime) -> tuple:
+    """Get time, latitude and longitude arrays of a mower's fixes in [start, stop)."""
+    query = f'''
+    from(bucket: "{INFLUXDB_BUCKET}")
+        |> range(start: {flux_time(start)}, stop: {flux_time(stop)})
+        |> filter(fn: (r) => r._measurement == "mower_position")
+        |> filter(fn: (r) => r.mower_id == "{mower_id}")
+        |> filter(fn: (r) => r._field == "latitude" or r._field == "longitude")
+        |> pivot(rowKey:["_time"], columnKey: ["_field"], valueColumn: "_value")
+        |> group()
+        |> sort(columns: ["_time"])
+    '''
+
+    result = query_api.query(query)
+    records = [record for table in result for record in table.records]
+    times = np.array([record.get_time().timestamp() for record in records])
+    lats = np.array([record.values.get("latitude") for record in records], dtype=float)
+    lons = np.array([record.values.get("longitude") for record in records], dtype=float)
+    return times, lats, lons
+
+def playback_chunks(mower_id: str, start: datetime, stop: datetime, step: float):
+    """Yield NDJSON chunks of interpolated frames, querying one window at a time."""
+    previous = query_playback_statuses(mower_id, start - timedelta(days=1), start, latest_only=True)
+    current_status = previous[0][1] if previous else None
+    last_sent_status = None
+    frame_time = start.timestamp()
+    margin = timedelta(seconds=PLAYBACK_MAX_GAP)
+
+    window_start = start
+    while window_start < stop:
+        window_stop = min(window_start + timedelta(seconds=PLAYBACK_WINDOW), stop)
+
+        # Fetch fixes just outside the window too, so frames at its edges can be interpolated
+        times, lats, lons = query_playback_positions(mower_id, window_start - margin, window_stop + margin)
+        statuses = query_playback_statuses(mower_id, window_start, window_stop)
+        status_times = np.array([status_time for status_time, _ in statuses])
+
+        frame_times = np.arange(frame_time, window_stop.timestamp(), step)
+        if len(frame_times):
+            frame_time = frame_times[-1] + step
+
+        # Linear interpolation between the surrounding fixes, skipping frames in long gaps
+        after = np.searchsorted(times, frame_times, side="right")
+        before = after - 1
+        valid = (before >= 0) & (after < len(times))
+        before, after, frame_times = before[valid], after[valid], frame_times[valid]
+        gaps = times[after] - times[before]
+        valid = gaps <= PLAYBACK_MAX_GAP
+        before, after, frame_times, gaps = before[valid], after[valid], frame_times[valid], gaps[valid]
+
+        fraction = np.where(gaps > 0, (frame_times - times[before]) / np.where(gaps > 0, gaps, 1), 0)
+        frame_lats = lats[before] + fraction * (lats[after] - lats[before])
+        frame_lons = lons[before] + fraction * (lons[after] - lons[before])
+        status_index = np.searchsorted(status_times, frame_times, side="right") - 1
+
+        frames = []
+        for i in range(len(frame_times)):
+            if status_index[i] >= 0:
+                current_status = statuses[status_index[i]][1]
+
+            frame = {
+                "time": datetime.fromtimestamp(frame_times[i], timezone.utc).isoformat(),
+                "latitude": round(float(frame_lats[i]), 7),
+                "longitude": round(float(frame_lons[i]), 7)
+            }
+            # Only send the status when it changes
+            if current_status != last_sent_status:
+                frame["status"] = current_status
+                last_sent_status = current_status
+            frames.append(frame)
+
+            if len(frames) == PLAYBACK_CHUNK_FRAMES:
+                yield json.dumps({"frames": frames}) + "\n"
+                frames = []
+
+        if frames:
+            yield json.dumps({"frames": frames}) + "\n"
+
+        window_start = window_stop
+
+@app.get("/api/playback")
+async def get_playback(mower_id: str, hours: int = 1, start: Optional[datetime] = None,
+                       stop: Optional[datetime] = None, rate: float = 60, fps: int = 10):
+    """Stream a mower's path as interpolated frames for animated playback.
+
+    Frames are `rate / fps` seconds of mower time apart, so playing them at
+    `fps` frames per second replays the path `rate` times faster than real
+    time. The response is newline-delimited JSON, one chunk of frames per line.
+    """
+    stop = stop or datetime.now(timezone.utc)
+    start = start or stop - timedelta(hours=hours)
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    if stop.tzinfo is None:
+        stop = stop.replace(tzinfo=timezone.utc)
+
+    if rate <= 0 or fps <= 0:
+        raise HTTPException(status_code=400, detail="rate and fps must be positive")
+    if start >= stop:
+        raise HTTPException(status_code=400, detail="start must be before stop")
+
+    step = rate / fps
+    if (stop - start).total_seconds() / step > PLAYBACK_MAX_FRAMES:
+        raise HTTPException(status_code=400,
+                            detail=f"Too many frames, use a higher rate or a shorter time range "
+                                   f"(at most {PLAYBACK_MAX_FRAMES} frames)")
+
+    return StreamingResponse(playback_chunks(mower_id, start, stop, step), media_type="application/x-ndjson")
+
 if __name__ == "__main__":
-    uvicorn.run("frontend:app", host="0.0.0.0", port=8000, reload=True)
+    uvicorn.run("frontend:app", host="0.0.0.0", port=8000,
+                reload=FRONTEND_WORKERS == 1, workers=FRONTEND_WORKERS)
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Automower Response Cache - A small on-disk cache shared by all frontend
+worker processes, so that expensive query results are computed once.
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import tempfile
+from typing import Any, Optional
+
+logger = logging.getLogger("automower_response_cache")
+
+# Remove expired entries after this many writes
+PRUNE_EVERY = 100
+
+
+class SharedCache:
+    """JSON values stored as files in a directory that every worker can read.
+
+    Entries are written atomically, so a reader never sees a partial value,
+    and expire after max_age seconds.
+    """
+
+    def __init__(self, directory: str, max_age: float):
+        self.directory = directory
+        self.max_age = max_age
+        self.writes = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return os.path.join(self.directory, f"{digest}.json")
+
+    def get(self, key: str, max_age: Optional[float] = None) -> Optional[Any]:
+        """Return the cached value for key, or None if it is missing or expired."""
+        path = self._path(key)
+        max_age = self.max_age if max_age is None else max_age
+
+        try:
+            if time.time() - os.path.getmtime(path) > max_age:
+                return None
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a JSON-serializable value for key."""
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(value, f)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            logger.warning(f"Failed to write cache entry: {e}")
+            return
+
+        self.writes += 1
+        if self.writes % PRUNE_EVERY == 0:
+            self.prune()
+
+    def prune(self) -> None:
+        """Remove expired entries and leftover temporary files."""
+        now = time.time()
+        for entry in os.scandir(self.directory):
+            try:
+                if now - entry.stat().st_mtime > self.max_age:
+                    os.remove(entry.path)
+            except OSError:
+                # Another worker may have removed or replaced it already
+                continue
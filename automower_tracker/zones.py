@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Automower Zones - Lawn zone definitions loaded from GeoJSON and
+per-zone statistics computed from stored position data.
+"""
+
+import json
+import logging
+import os
+from datetime import datetime, date, timedelta, timezone
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+
+logger = logging.getLogger("automower_zones")
+
+# Zone definitions file (GeoJSON FeatureCollection of Polygon/MultiPolygon features)
+ZONES_FILE = os.getenv("ZONES_FILE", "zones.geojson")
+
+# Consecutive positions further apart than this are not counted as time or distance
+MAX_SEGMENT_GAP = 60
+
+# Mean earth radius in meters, used for haversine distances
+EARTH_RADIUS = 6371000.0
+
+
+class Zone:
+    """A named lawn zone made of one or more polygons."""
+
+    def __init__(self, name: str, polygons: List[List[np.ndarray]]):
+        self.name = name
+        # Each polygon is a list of rings (outer ring first, then holes) as (n, 2) lon/lat arrays
+        self.polygons = polygons
+
+        points = np.concatenate([ring for polygon in polygons for ring in polygon])
+        self.min_lon, self.min_lat = points.min(axis=0)
+        self.max_lon, self.max_lat = points.max(axis=0)
+
+    def contains(self, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        """Return a boolean mask of the points that fall inside this zone."""
+        inside = np.zeros(len(lats), dtype=bool)
+
+        # Only run the full test on points inside the bounding box
+        candidates = np.flatnonzero(
+            (lons >= self.min_lon) & (lons <= self.max_lon)
+            & (lats >= self.min_lat) & (lats <= self.max_lat)
+        )
+        if len(candidates) == 0:
+            return inside
+
+        x = lons[candidates]
+        y = lats[candidates]
+        hit = np.zeros(len(candidates), dtype=bool)
+        for polygon in self.polygons:
+            # Even-odd rule over all rings handles holes as well
+            in_polygon = np.zeros(len(candidates), dtype=bool)
+            for ring in polygon:
+                in_polygon ^= _points_in_ring(x, y, ring)
+            hit |= in_polygon
+
+        inside[candidates] = hit
+        return inside
+
+
+def _points_in_ring(x: np.ndarray, y: np.ndarray, ring: np.ndarray) -> np.ndarray:
+    """Ray casting point-in-polygon test, vectorized over the points."""
+    inside = np.zeros(len(x), dtype=bool)
+    xi, yi = ring[:, 0], ring[:, 1]
+    xj, yj = np.roll(xi, 1), np.roll(yi, 1)
+
+    for x1, y1, x2, y2 in zip(xi, yi, xj, yj):
+        if y1 == y2:
+            continue
+        crosses = (y1 > y) != (y2 > y)
+        x_cross = (x2 - x1) * (y - y1) / (y2 - y1) + x1
+        inside ^= crosses & (x < x_cross)
+
+    return inside
+
+
+def load_zones(path: str = ZONES_FILE) -> List[Zone]:
+    """Load zone definitions from a GeoJSON file."""
+    if not os.path.exists(path):
+        logger.info(f"No zones file found at {path}")
+        return []
+
+    with open(path) as f:
+        data = json.load(f)
+
+    features = data.get("features", []) if data.get("type") == "FeatureCollection" else [data]
+
+    zones = []
+    for i, feature in enumerate(features):
+        geometry = feature.get("geometry") or {}
+        name = (feature.get("properties") or {}).get("name", f"Zone {i + 1}")
+
+        if geometry.get("type") == "Polygon":
+            coordinates = [geometry["coordinates"]]
+        elif geometry.get("type") == "MultiPolygon":
+            coordinates = geometry["coordinates"]
+        else:
+            logger.warning(f"Skipping zone {name}: unsupported geometry {geometry.get('type')}")
+            continue
+
+        polygons = [[np.asarray(ring, dtype=float)[:, :2] for ring in polygon] for polygon in coordinates]
+        zones.append(Zone(name, polygons))
+
+    logger.info(f"Loaded {len(zones)} zones from {path}")
+    return zones
+
+
+def assign_zones(zones: List[Zone], lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Return the index of the zone each point falls in, or -1 for none.
+
+    When zones overlap, the first zone in the file wins.
+    """
+    assigned = np.full(len(lats), -1, dtype=np.int64)
+    for index, zone in enumerate(zones):
+        unassigned = assigned == -1
+        if not unassigned.any():
+            break
+        assigned[unassigned & zone.contains(lats, lons)] = index
+    return assigned
+
+
+def haversine(lat1: np.ndarray, lon1: np.ndarray, lat2: np.ndarray, lon2: np.ndarray) -> np.ndarray:
+    """Great-circle distance in meters between arrays of points."""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS * np.arcsin(np.sqrt(a))
+
+
+class ZoneStatsCache:
+    """Per-day, per-mower zone aggregates that are updated incrementally.
+
+    The cache covers a contiguous span of whole days ending at the newest data.
+    Older days are loaded once when first requested, and the current day is
+    topped up with whatever was stored after each mower's watermarks.
+    """
+
+    def __init__(self, zones: List[Zone]):
+        self.zones = zones
+        self.covered_from: Optional[datetime] = None
+        # Newest cached position time and error onset per mower, keyed by mower_id
+        self.position_watermarks: Dict[str, datetime] = {}
+        self.error_watermarks: Dict[str, datetime] = {}
+        # When the cache was last topped up
+        self.refreshed_at: Optional[datetime] = None
+        self.days: Dict[date, Dict[str, Any]] = {}
+
+    def _day(self, day: date) -> Dict[str, Any]:
+        if day not in self.days:
+            self.days[day] = {"last_positions": {}, "mowers": {}}
+        return self.days[day]
+
+    def _mower_totals(self, day: date, mower_id: str, name: Optional[str]) -> Dict[str, Any]:
+        mowers = self._day(day)["mowers"]
+        if mower_id not in mowers:
+            mowers[mower_id] = {
+                "name": name,
+                "time_seconds": np.zeros(len(self.zones)),
+                "distance_meters": np.zeros(len(self.zones)),
+                "error_count": np.zeros(len(self.zones), dtype=np.int64),
+            }
+        return mowers[mower_id]
+
+    def add_positions(self, mower_id: str, name: Optional[str], times: np.ndarray,
+                      lats: np.ndarray, lons: np.ndarray) -> None:
+        """Fold time-ordered positions of one mower (epoch seconds) into the aggregates."""
+        if len(times) == 0:
+            return
+
+        zone_index = assign_zones(self.zones, lats, lons)
+        day_numbers = (times // 86400).astype(np.int64)
+
+        for day_number in np.unique(day_numbers):
+            mask = day_numbers == day_number
+            day = date(1970, 1, 1) + timedelta(days=int(day_number))
+            self._add_day_positions(day, mower_id, name, times[mask], lats[mask], lons[mask], zone_index[mask])
+
+    def _add_day_positions(self, day: date, mower_id: str, name: Optional[str], times: np.ndarray,
+                           lats: np.ndarray, lons: np.ndarray, zone_index: np.ndarray) -> None:
+        totals = self._mower_totals(day, mower_id, name)
+        last_positions = self._day(day)["last_positions"]
+
+        # Continue the track from the last position seen in a previous update
+        previous = last_positions.get(mower_id)
+        if previous:
+            times = np.concatenate(([previous[0]], times))
+            lats = np.concatenate(([previous[1]], lats))
+            lons = np.concatenate(([previous[2]], lons))
+            zone_index = np.concatenate(([previous[3]], zone_index))
+
+        last_positions[mower_id] = (times[-1], lats[-1], lons[-1], zone_index[-1])
+        if len(times) < 2:
+            return
+
+        # Each segment is attributed to the zone of its starting point
+        gaps = np.diff(times)
+        distances = haversine(lats[:-1], lons[:-1], lats[1:], lons[1:])
+        valid = (gaps > 0) & (gaps <= MAX_SEGMENT_GAP) & (zone_index[:-1] >= 0)
+        start_zones = zone_index[:-1][valid]
+
+        totals["time_seconds"] += np.bincount(start_zones, weights=gaps[valid], minlength=len(self.zones))
+        totals["distance_meters"] += np.bincount(start_zones, weights=distances[valid], minlength=len(self.zones))
+
+    def add_errors(self, mower_id: str, name: Optional[str], times: np.ndarray,
+                   lats: np.ndarray, lons: np.ndarray) -> None:
+        """Fold error incident onsets of one mower (epoch seconds) into the aggregates."""
+        if len(times) == 0:
+            return
+
+        zone_index = assign_zones(self.zones, lats, lons)
+        day_numbers = (times // 86400).astype(np.int64)
+
+        for day_number in np.unique(day_numbers):
+            mask = (day_numbers == day_number) & (zone_index >= 0)
+            day = date(1970, 1, 1) + timedelta(days=int(day_number))
+            totals = self._mower_totals(day, mower_id, name)
+            totals["error_count"] += np.bincount(zone_index[mask], minlength=len(self.zones))
+
+    def summarize(self, days: List[date], mower_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Combine the cached aggregates of the given days into per-zone stats."""
+        time_seconds = np.zeros(len(self.zones))
+        distance_meters = np.zeros(len(self.zones))
+        error_count = np.zeros(len(self.zones), dtype=np.int64)
+
+        for day in days:
+            for cached_mower_id, totals in self.days.get(day, {}).get("mowers", {}).items():
+                if mower_id and cached_mower_id != mower_id:
+                    continue
+                time_seconds += totals["time_seconds"]
+                distance_meters += totals["distance_meters"]
+                error_count += totals["error_count"]
+
+        return [
+            {
+                "zone": zone.name,
+                "time_seconds": round(float(time_seconds[i]), 1),
+                "distance_meters": round(float(distance_meters[i]), 1),
+                "error_count": int(error_count[i]),
+            }
+            for i, zone in enumerate(self.zones)
+        ]
+
+
+def day_start(day: date) -> datetime:
+    """Return the UTC start of a day."""
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
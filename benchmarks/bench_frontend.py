@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Automower Frontend Benchmarks
+-----------------------------
+Runs the frontend query endpoints against synthetic data served by a local
+stand-in for the InfluxDB query API, and records per endpoint and data size:
+server-side latency, serialization time, response bytes and peak RSS.
+
+Every case runs in its own process so that peak RSS is measured per case.
+Results are saved as a JSON baseline, and can be compared with an earlier one.
+
+Usage:
+    python benchmarks/bench_frontend.py --sizes 10000,1000000 --output benchmarks/results/baseline.json
+    python benchmarks/bench_frontend.py --compare benchmarks/results/baseline.json
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import inspect
+import argparse
+import platform
+import resource
+import tempfile
+import multiprocessing
+from datetime import datetime, timezone
+from typing import Dict, List, Any, Callable
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARK_DIR)
+sys.path.insert(0, BENCHMARK_DIR)
+sys.path.insert(0, os.path.join(REPO_DIR, "automower_tracker"))
+
+from synthetic import generate_dataset, dataset_hours, zone_features, SyntheticQueryApi  # noqa: E402
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+
+# Endpoint cases: name -> function building the endpoint keyword arguments
+CASES: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    "positions": lambda ctx: {"hours": ctx["hours"]},
+    "positions_viewport": lambda ctx: {"hours": ctx["hours"], "zoom": 19, **ctx["viewport"]},
+    "positions_overview": lambda ctx: {"hours": ctx["hours"], "zoom": 12},
+    "heatmap_overview": lambda ctx: {"hours": ctx["hours"], "zoom": 12},
+    "positions_bounds": lambda ctx: {"hours": ctx["hours"]},
+    "status": lambda ctx: {"mower_id": ctx["mower_id"]},
+    "mowers": lambda ctx: {},
+    "errors": lambda ctx: {"hours": ctx["hours"], "limit": 100, "offset": 0},
+    "zone_stats": lambda ctx: {"days": ctx["hours"] // 24 + 1},
+}
+
+# Frontend endpoint function per case
+ENDPOINTS = {
+    "positions": "get_positions",
+    "positions_viewport": "get_positions",
+    "positions_overview": "get_positions",
+    "heatmap_overview": "get_positions_density",
+    "positions_bounds": "get_positions_bounds",
+    "status": "get_mower_status",
+    "mowers": "get_mowers",
+    "errors": "get_errors",
+    "zone_stats": "get_zone_stats",
+}
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_case(case: str, size: int, mowers: int, results: multiprocessing.Queue) -> None:
+    """Run one endpoint case on a freshly generated dataset and report its metrics."""
+    dataset = generate_dataset(size, mowers)
+
+    # Point the frontend at a zones file matching the synthetic lawns
+    with tempfile.NamedTemporaryFile("w", suffix=".geojson", delete=False) as f:
+        json.dump({"type": "FeatureCollection", "features": zone_features(dataset)}, f)
+    os.environ["ZONES_FILE"] = f.name
+    os.environ["CACHE_DIR"] = tempfile.mkdtemp()
+
+    # The frontend resolves its templates and static files from the repository root
+    os.chdir(REPO_DIR)
+    import frontend
+    from fastapi.encoders import jsonable_encoder
+
+    frontend.query_api = SyntheticQueryApi(dataset)
+    os.unlink(f.name)
+
+    lats = dataset[0]["mower_position"]["latitude"]
+    lons = dataset[0]["mower_position"]["longitude"]
+    context = {
+        "hours": dataset_hours(dataset),
+        "mower_id": dataset[0]["mower_id"],
+        "viewport": {
+            "min_lat": float(lats.min()), "max_lat": float((lats.min() + lats.max()) / 2),
+            "min_lon": float(lons.min()), "max_lon": float((lons.min() + lons.max()) / 2),
+        },
+    }
+
+    # Call the endpoint itself, without the conditional GET and response cache wrapper
+    endpoint = getattr(frontend, ENDPOINTS[case])
+    endpoint = getattr(endpoint, "__wrapped__", endpoint)
+    kwargs = CASES[case](context)
+    if "request" in inspect.signature(endpoint).parameters:
+        kwargs["request"] = None
+
+    rss_before = peak_rss_mb()
+    started = time.perf_counter()
+    data = asyncio.run(endpoint(**kwargs))
+    latency = time.perf_counter() - started
+
+    started = time.perf_counter()
+    body = json.dumps(jsonable_encoder(data))
+    serialization = time.perf_counter() - started
+
+    results.put({
+        "endpoint": case,
+        "points": size,
+        "latency_ms": round(latency * 1000, 2),
+        "serialization_ms": round(serialization * 1000, 2),
+        "response_bytes": len(body),
+        "items": len(data) if isinstance(data, list) else 1,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "rss_growth_mb": round(peak_rss_mb() - rss_before, 1),
+    })
+
+
+def run_benchmarks(sizes: List[int], cases: List[str], mowers: int) -> List[Dict[str, Any]]:
+    """Run every case for every size, each in a separate process."""
+    context = multiprocessing.get_context("spawn")
+    measurements = []
+
+    for size in sizes:
+        for case in cases:
+            results = context.Queue()
+            process = context.Process(target=run_case, args=(case, size, mowers, results))
+            process.start()
+            process.join()
+
+            if process.exitcode != 0:
+                print(f"{case:20} {size:>10} points  FAILED (exit code {process.exitcode})")
+                continue
+
+            result = results.get()
+            measurements.append(result)
+            print(f"{case:20} {size:>10} points  {result['latency_ms']:>10.1f} ms  "
+                  f"{result['serialization_ms']:>9.1f} ms json  {result['response_bytes']:>12} B  "
+                  f"{result['peak_rss_mb']:>8.1f} MiB peak")
+
+    return measurements
+
+
+def compare(measurements: List[Dict[str, Any]], baseline_path: str) -> None:
+    """Print the ratio of each measurement to the matching baseline entry."""
+    with open(baseline_path) as f:
+        baseline = {(m["endpoint"], m["points"]): m for m in json.load(f)["results"]}
+
+    print(f"\nCompared with {baseline_path} (current / baseline):")
+    for result in measurements:
+        previous = baseline.get((result["endpoint"], result["points"]))
+        if not previous:
+            continue
+        ratios = []
+        for metric in ("latency_ms", "serialization_ms", "response_bytes", "peak_rss_mb"):
+            if previous[metric]:
+                ratios.append(f"{metric} x{result[metric] / previous[metric]:.2f}")
+        print(f"{result['endpoint']:20} {result['points']:>10} points  " + "  ".join(ratios))
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Benchmark frontend endpoints on synthetic data")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="Comma-separated total position counts")
+    parser.add_argument("--cases", default=",".join(CASES), help="Comma-separated endpoint cases")
+    parser.add_argument("--mowers", type=int, default=3, help="Number of synthetic mowers")
+    parser.add_argument("-o", "--output", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Compare results with this baseline JSON file")
+
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    cases = args.cases.split(",")
+    unknown = [case for case in cases if case not in CASES]
+    if unknown:
+        print(f"Error: unknown cases: {', '.join(unknown)}")
+        sys.exit(1)
+
+    measurements = run_benchmarks(sizes, cases, args.mowers)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump({
+                "created": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "mowers": args.mowers,
+                "results": measurements,
+            }, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        compare(measurements, args.compare)
+
+
+if __name__ == "__main__":
+    main()
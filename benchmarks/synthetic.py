@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Synthetic Automower data and a local stand-in for the InfluxDB query API.
+
+The generator produces realistic mowing sessions for several mowers: random
+bounce mowing inside a rectangular lawn with a fix every POSITION_INTERVAL
+seconds, charging breaks, occasional errors and a status point every
+POLL_INTERVAL seconds. SyntheticQueryApi answers the Flux queries issued by
+frontend.py from those arrays, so endpoints can be benchmarked without InfluxDB.
+"""
+
+import re
+from datetime import datetime, timezone
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+from influxdb_client.client.flux_table import FluxRecord, FluxTable
+
+POSITION_INTERVAL = 30
+POLL_INTERVAL = 300
+
+# Mowing sessions are followed by a charging break without positions
+SESSION_POSITIONS = 180
+CHARGE_SECONDS = 3600
+
+# Mower speed in meters per second and lawn size in meters
+SPEED = 0.4
+LAWN_WIDTH = 40.0
+LAWN_HEIGHT = 25.0
+
+# Chance per position that an error starts, and the errors that can occur
+ERROR_PROBABILITY = 0.002
+ERROR_CHOICES = {1: "Outside working area", 2: "No loop signal", 9: "Trapped", 13: "No drive", 14: "Mower lifted"}
+
+# Meters per degree of latitude
+METERS_PER_DEGREE = 111320.0
+
+
+def generate_mower(points: int, mower_index: int, end: datetime, rng: np.random.Generator) -> Dict[str, Any]:
+    """Generate the positions, status points and error incidents of one mower."""
+    base_lat = 51.05 + mower_index * 0.001
+    base_lon = 3.72 + mower_index * 0.001
+    meters_per_lon_degree = METERS_PER_DEGREE * np.cos(np.radians(base_lat))
+
+    # Random bounce mowing: straight lines, new random heading at the lawn edge
+    x = np.empty(points)
+    y = np.empty(points)
+    px, py = LAWN_WIDTH / 2, LAWN_HEIGHT / 2
+    heading = rng.uniform(0, 2 * np.pi)
+    step = SPEED * POSITION_INTERVAL
+    for i in range(points):
+        nx, ny = px + step * np.cos(heading), py + step * np.sin(heading)
+        while not (0 <= nx <= LAWN_WIDTH and 0 <= ny <= LAWN_HEIGHT):
+            heading = rng.uniform(0, 2 * np.pi)
+            nx, ny = px + step * np.cos(heading), py + step * np.sin(heading)
+        px, py = nx, ny
+        x[i], y[i] = px, py
+
+    # Timestamps: sessions of SESSION_POSITIONS fixes separated by charging breaks
+    index = np.arange(points)
+    offsets = index * POSITION_INTERVAL + (index // SESSION_POSITIONS) * CHARGE_SECONDS
+    start = end.timestamp() - offsets[-1]
+    times = start + offsets
+
+    # Errors last a few fixes
+    error_codes = np.zeros(points, dtype=np.int64)
+    for i in np.flatnonzero(rng.random(points) < ERROR_PROBABILITY):
+        error_codes[i:i + rng.integers(2, 10)] = rng.choice(list(ERROR_CHOICES))
+
+    positions = {
+        "time": times,
+        "latitude": base_lat + y / METERS_PER_DEGREE,
+        "longitude": base_lon + x / meters_per_lon_degree,
+        "error_code": error_codes,
+    }
+
+    # A status point per poll, battery draining while mowing and charging in between
+    status_times = np.arange(times[0], times[-1] + 1, POLL_INTERVAL)
+    fix = np.clip(np.searchsorted(times, status_times), 0, points - 1)
+    mowing = np.abs(times[fix] - status_times) <= POLL_INTERVAL
+    status = {
+        "time": status_times,
+        "battery_percent": np.where(mowing, 100 - (fix % SESSION_POSITIONS) * 70 // SESSION_POSITIONS, 60),
+        "error_code": np.where(mowing, error_codes[fix], 0),
+        "activity": np.where(mowing, "MOWING", "CHARGING"),
+    }
+
+    # One incident per run of equal, non-zero error codes
+    changes = np.flatnonzero(np.diff(np.concatenate(([0], error_codes, [0]))))
+    incidents = {"time": [], "error_code": [], "latitude": [], "longitude": [], "duration_seconds": []}
+    for onset, cleared in zip(changes[:-1], changes[1:]):
+        if error_codes[onset] == 0:
+            continue
+        incidents["time"].append(times[onset])
+        incidents["error_code"].append(int(error_codes[onset]))
+        incidents["latitude"].append(positions["latitude"][onset])
+        incidents["longitude"].append(positions["longitude"][onset])
+        incidents["duration_seconds"].append(float(times[min(cleared, points - 1)] - times[onset]))
+
+    return {
+        "mower_id": f"mower-{mower_index + 1}",
+        "name": f"Mower {mower_index + 1}",
+        "mower_position": positions,
+        "mower_status": status,
+        "mower_error_event": {key: np.array(values) for key, values in incidents.items()},
+    }
+
+
+def generate_dataset(points: int, mowers: int = 3, seed: int = 42) -> List[Dict[str, Any]]:
+    """Generate `points` positions in total, split over `mowers` mowers."""
+    rng = np.random.default_rng(seed)
+    end = datetime.now(timezone.utc)
+    return [generate_mower(max(points // mowers, 2), i, end, rng) for i in range(mowers)]
+
+
+def dataset_hours(dataset: List[Dict[str, Any]]) -> int:
+    """Hours of history covered by a dataset, rounded up."""
+    start = min(mower["mower_position"]["time"][0] for mower in dataset)
+    return int(np.ceil((datetime.now(timezone.utc).timestamp() - start) / 3600)) + 1
+
+
+def zone_features(dataset: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """GeoJSON features splitting each mower's lawn into a left and right zone."""
+    features = []
+    for mower in dataset:
+        lats = mower["mower_position"]["latitude"]
+        lons = mower["mower_position"]["longitude"]
+        south, north = lats.min(), lats.max()
+        west, east = lons.min(), lons.max()
+        middle = (west + east) / 2
+        for name, (left, right) in (("left", (west, middle)), ("right", (middle, east))):
+            ring = [[left, south], [right, south], [right, north], [left, north], [left, south]]
+            features.append({
+                "type": "Feature",
+                "properties": {"name": f"{mower['name']} {name}"},
+                "geometry": {"type": "Polygon", "coordinates": [ring]},
+            })
+    return features
+
+
+class SyntheticQueryApi:
+    """Answers the Flux queries issued by frontend.py from a synthetic dataset.
+
+    Only the query shapes used by the frontend are understood: measurement,
+    time range, mower (including excluded mowers) and bounding box filters, last(), sort/limit for the
+    latest status, sort/limit across mowers after group(), distinct mowers and
+    min()/max() bounds.
+    """
+
+    def __init__(self, dataset: List[Dict[str, Any]]):
+        self.dataset = dataset
+
+    def query(self, query: str, org: Optional[str] = None) -> List[FluxTable]:
+        measurement = re.search(r'r\._measurement == "(\w+)"', query).group(1)
+        mower_match = re.search(r'r\.mower_id == "([\w-]+)"', query)
+        excluded_match = re.search(r"not contains\(value: r\.mower_id, set: \[([^\]]*)\]\)", query)
+        excluded = set(re.findall(r'"([\w-]+)"', excluded_match.group(1))) if excluded_match else set()
+        start, stop = self._time_range(query)
+
+        bounds = re.search(r"r\.latitude >= ([-\d.e]+) and r\.latitude <= ([-\d.e]+) "
+                           r"and r\.longitude >= ([-\d.e]+) and r\.longitude <= ([-\d.e]+)", query)
+
+        limit_match = re.search(r"limit\(n: (\d+)(?:, offset: (\d+))?\)", query)
+
+        selected = []
+        for mower in self.dataset:
+            if mower_match and mower["mower_id"] != mower_match.group(1):
+                continue
+            if mower["mower_id"] in excluded:
+                continue
+
+            data = mower[measurement]
+            mask = (data["time"] >= start) & (data["time"] < stop)
+            if bounds:
+                min_lat, max_lat, min_lon, max_lon = map(float, bounds.groups())
+                mask &= (data["latitude"] >= min_lat) & (data["latitude"] <= max_lat)
+                mask &= (data["longitude"] >= min_lon) & (data["longitude"] <= max_lon)
+            rows = np.flatnonzero(mask)
+            if len(rows) > 0:
+                selected.append((mower, data, rows))
+
+        if 'yield(name: "min")' in query:
+            return self._bounds_tables(selected)
+
+        if "|> group()" in query:
+            return self._merged_tables(selected, "desc: true" in query, limit_match)
+
+        tables = []
+        for mower, data, rows in selected:
+            if "last()" in query or "distinct(" in query:
+                rows = rows[-1:]
+            elif "desc: true" in query:
+                rows = rows[::-1]
+            if limit_match:
+                offset = int(limit_match.group(2) or 0)
+                rows = rows[offset:offset + int(limit_match.group(1))]
+            tables.append(self._table(mower, data, rows))
+
+        return tables
+
+    def _time_range(self, query: str) -> tuple:
+        now = datetime.now(timezone.utc).timestamp()
+        range_match = re.search(r"range\(start: ([^,)]+)(?:, stop: ([^)]+))?\)", query)
+        return self._parse_time(range_match.group(1), now), self._parse_time(range_match.group(2), now, now + 1)
+
+    def _parse_time(self, value: Optional[str], now: float, default: float = 0.0) -> float:
+        if value is None:
+            return default
+        relative = re.fullmatch(r"-(\d+)([hd])", value.strip())
+        if relative:
+            unit = 3600 if relative.group(2) == "h" else 86400
+            return now - int(relative.group(1)) * unit
+        return datetime.fromisoformat(value.strip().replace("Z", "+00:00")).timestamp()
+
+    def _table(self, mower: Dict[str, Any], data: Dict[str, np.ndarray], rows: np.ndarray) -> FluxTable:
+        table = FluxTable()
+        columns = {key: values[rows].tolist() for key, values in data.items() if key != "time"}
+        for i, row in enumerate(rows):
+            values = {key: column[i] for key, column in columns.items()}
+            values["_time"] = datetime.fromtimestamp(data["time"][row], timezone.utc)
+            values["mower_id"] = mower["mower_id"]
+            values["name"] = mower["name"]
+            table.records.append(FluxRecord(0, values))
+        return table
+
+    def _merged_tables(self, selected: List[tuple], descending: bool, limit_match) -> List[FluxTable]:
+        """One table of all mowers' rows sorted by time, with limit/offset applied to the whole."""
+        if not selected:
+            return []
+
+        times = np.concatenate([data["time"][rows] for _, data, rows in selected])
+        sources = np.concatenate([np.full(len(rows), i) for i, (_, _, rows) in enumerate(selected)])
+        source_rows = np.concatenate([rows for _, _, rows in selected])
+
+        order = np.argsort(times, kind="stable")
+        if descending:
+            order = order[::-1]
+        if limit_match:
+            offset = int(limit_match.group(2) or 0)
+            order = order[offset:offset + int(limit_match.group(1))]
+
+        merged = FluxTable()
+        for i in order:
+            mower, data, _ = selected[sources[i]]
+            merged.records.extend(self._table(mower, data, source_rows[i:i + 1]).records)
+        return [merged]
+
+    def _bounds_tables(self, selected: List[tuple]) -> List[FluxTable]:
+        tables = []
+        if not selected:
+            return tables
+
+        for result, reduce in (("min", np.min), ("max", np.max)):
+            for field in ("latitude", "longitude"):
+                table = FluxTable()
+                value = float(reduce([reduce(data[field][rows]) for _, data, rows in selected]))
+                table.records.append(FluxRecord(0, {"result": result, "_field": field, "_value": value}))
+                tables.append(table)
+        return tables